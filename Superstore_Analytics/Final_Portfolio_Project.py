@@ -14,6 +14,10 @@ root_dir = os.path.dirname(script_dir)
 sys.path.append(root_dir)
 sys.path.append(script_dir)
 
+# Union of the columns used by the RFM, profitability and clustering metrics
+# (the profit leakage report reads its own full order lines, same as the standalone script)
+PIPELINE_COLUMNS = "Order_ID, Order_Date, Customer_ID, Sales, Discount, Profit"
+
 def run_pipeline():
     print("="*60)
     print("🔥 STARTING ENTERPRISE ANALYTICS PIPELINE")
@@ -24,20 +28,24 @@ def run_pipeline():
         from setup_database import setup_db
         setup_db()
         
+        # Load the orders once and share them across every step
+        from data_loader import load_orders
+        orders = load_orders(PIPELINE_COLUMNS)
+        
         # Step 1: RFM Analysis
-        from Superstore_Analytics import rfm_analysis
-        rfm_data = rfm_analysis.load_data()
-        rfm_results = rfm_analysis.calculate_rfm(rfm_data)
+        # Analysis modules are imported by their script name (script_dir is on sys.path), the
+        # same name they run under standalone, so numba's on-disk cache resolves either way
+        import rfm_analysis
+        rfm_results = rfm_analysis.calculate_rfm(orders)
         rfm_analysis.generate_reports(rfm_results)
         
         # Step 2: Profitability & ROI Simulation
-        from Superstore_Analytics import profit_loss_analysis
-        profit_data = profit_loss_analysis.get_analytical_data()
-        profit_loss_analysis.analyze_leakage(profit_data)
+        import profit_loss_analysis
+        profit_loss_analysis.analyze_leakage(orders)
         
         # Step 3: Advanced ML Clustering
-        from Superstore_Analytics import customer_clustering
-        customer_clustering.run_ml_segmentation()
+        import customer_clustering
+        customer_clustering.run_ml_segmentation(orders)
         
         # Step 4: Forecasting
         # Note: forecasting script runs independently as a standalone module
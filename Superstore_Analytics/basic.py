@@ -1,8 +1,9 @@
 import pandas as pd
+import numpy as np
+from data_loader import load_superstore, write_csv
 
-# 1. Load the data
-url = "https://raw.githubusercontent.com/sumit0072/Superstore-Data-Analysis/main/Sample%20-%20Superstore.csv"
-df = pd.read_csv(url, encoding='windows-1252') # Common encoding for Excel-generated CSVs
+# 1. Load the data (downloaded once, then served from the local cache)
+df = load_superstore()
 
 # 2. Quick Clean
 # Check for missing values
@@ -10,8 +11,10 @@ print(df.isnull().sum())
 
 # Let's assume we found some nulls (common in real life) and want to drop them
 df_clean = df.dropna()
-df_clean['Discount_Category'] = df_clean['Discount'].apply(lambda x: 'High' if x > 0.2 else 'Low')
+# One vectorized comparison; stored as a 2-entry categorical (int8 codes)
+high_discount = df_clean['Discount'].to_numpy() > 0.2
+df_clean['Discount_Category'] = pd.Categorical.from_codes(high_discount.astype(np.int8), categories=['Low', 'High'])
 
 # 4. Save the clean data for Power BI
-df_clean.to_csv('Superstore_Cleaned.csv', index=False)
+write_csv(df_clean, 'Superstore_Cleaned.csv')
 print("Data cleaned and saved successfully!")
\ No newline at end of file
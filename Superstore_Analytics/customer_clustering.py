@@ -1,34 +1,92 @@
 import pandas as pd
 import numpy as np
 import sqlite3
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 import plotly.express as px
 
-def run_ml_segmentation():
-    print("🤖 Initializing Machine Learning Data Pipeline...")
+try:
+    import polars as pl
+except ImportError:  # polars is optional; features are aggregated with pandas instead
+    pl = None
+
+FEATURE_QUERY = "SELECT Customer_ID, Sales, Profit, Discount FROM orders"
+
+# Order lines per chunk when aggregating without polars
+FEATURE_CHUNK_SIZE = 50_000
+
+# Above this many customers, full-batch K-Means gives way to mini-batches
+MINIBATCH_THRESHOLD = 100_000
+
+
+def _polars_features(orders):
+    # Multi-threaded Arrow group-by; only the small customer table reaches pandas
+    cust = (
+        orders
+        .group_by('Customer_ID')
+        .agg(pl.col('Sales').sum(), pl.col('Profit').sum(), pl.col('Discount').mean())
+        .sort('Customer_ID')
+    )
+    return cust.to_pandas()
+
+
+def aggregate_customer_features(df):
+    """Aggregate already-loaded order lines to one row of features per customer"""
+    if pl is not None:
+        return _polars_features(pl.from_pandas(df[['Customer_ID', 'Sales', 'Profit', 'Discount']]))
+    return df.groupby('Customer_ID', observed=True).agg(
+        Sales=('Sales', 'sum'),
+        Profit=('Profit', 'sum'),
+        Discount=('Discount', 'mean')
+    ).reset_index()
+
+
+def load_customer_features(db_path="superstore.db"):
+    """Fetch order lines and aggregate them to one row of features per customer"""
+    conn = sqlite3.connect(db_path)
+    try:
+        if pl is not None:
+            return _polars_features(pl.read_database(FEATURE_QUERY, conn))
+
+        # Fetch in chunks and aggregate to Customer Level as we go
+        # (peak memory stays flat as the orders table grows)
+        partials = []
+        for chunk in pd.read_sql_query(FEATURE_QUERY, conn, chunksize=FEATURE_CHUNK_SIZE):
+            partials.append(chunk.groupby('Customer_ID').agg(
+                Sales=('Sales', 'sum'),
+                Profit=('Profit', 'sum'),
+                Discount_Sum=('Discount', 'sum'),
+                Orders=('Discount', 'count')
+            ))
+    finally:
+        conn.close()
     
-    # 1. Fetch Data
-    conn = sqlite3.connect("superstore.db")
-    df = pd.read_sql("SELECT Customer_ID, Sales, Profit, Discount FROM orders", conn)
-    conn.close()
+    # Combine chunk partials; mean discount = total discount / order lines
+    cust_data = pd.concat(partials).groupby(level=0).sum()
+    cust_data['Discount'] = cust_data.pop('Discount_Sum') / cust_data.pop('Orders')
+    return cust_data.reset_index()
+
+
+def run_ml_segmentation(df=None):
+    print("🤖 Initializing Machine Learning Data Pipeline...")
     
-    # 2. Feature Engineering (Aggregating to Customer Level)
-    cust_data = df.groupby('Customer_ID').agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Discount': 'mean'
-    }).reset_index()
+    # 1 + 2. Fetch Data (unless the pipeline passes it in) and aggregate to Customer Level
+    cust_data = load_customer_features() if df is None else aggregate_customer_features(df)
     
     # 3. Preprocessing
     features = ['Sales', 'Profit', 'Discount']
-    X = cust_data[features]
+    X = cust_data[features].to_numpy()
     scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    # float32 halves memory traffic for the distance computations
+    X_scaled = np.ascontiguousarray(scaler.fit_transform(X), dtype=np.float32)
     
     # 4. K-Means Clustering (K=4 for 4 distinct business segments)
     print("🧠 Training K-Means Clustering Model...")
-    kmeans = KMeans(n_init=10, n_clusters=4, random_state=42)
+    if len(X_scaled) > MINIBATCH_THRESHOLD:
+        kmeans = MiniBatchKMeans(n_clusters=4, batch_size=1024, n_init=3, random_state=42)
+    else:
+        # Elkan prunes distance computations via the triangle inequality
+        kmeans = KMeans(n_clusters=4, n_init=3, algorithm='elkan', tol=1e-3, random_state=42)
     cust_data['ML_Cluster'] = kmeans.fit_predict(X_scaled)
     
     # 5. Labeling based on characteristics
@@ -0,0 +1,178 @@
+"""
+Shared Data Loader for Superstore Analytics
+Downloads the raw Superstore CSV once and serves it from a local Parquet cache afterwards,
+and reads query results from the SQLite data layer
+"""
+
+import os
+import sqlite3
+import urllib.request
+from functools import lru_cache
+
+import pandas as pd
+
+URL = "https://raw.githubusercontent.com/sumit0072/Superstore-Data-Analysis/main/Sample%20-%20Superstore.csv"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "superstore")
+CACHE_PATH = os.path.join(CACHE_DIR, "Sample-Superstore.csv")
+PARQUET_PATH = os.path.join(CACHE_DIR, "Sample-Superstore.parquet")
+DB_PATH = "superstore.db"
+
+# Low-cardinality text columns stored as dictionary codes instead of Python strings
+CATEGORY_COLUMNS = ['Category', 'Sub-Category', 'Region', 'Segment', 'Ship Mode', 'Customer ID']
+DATE_COLUMNS = ['Order Date', 'Ship Date']
+DATE_FORMAT = '%m/%d/%Y'
+
+
+def fetch_superstore():
+    """
+    Ensure the raw CSV exists in the local cache, downloading it on first use
+
+    Returns:
+        Path to the cached CSV file
+    """
+    if not os.path.exists(CACHE_PATH):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Download to a temp file first so an interrupted fetch never leaves a partial cache
+        tmp_path = CACHE_PATH + ".part"
+        urllib.request.urlretrieve(URL, tmp_path)
+        os.replace(tmp_path, CACHE_PATH)
+    return CACHE_PATH
+
+
+def read_csv(path):
+    """
+    Parse the raw CSV with Arrow's multi-threaded reader, dates included
+
+    Falls back to the pandas C parser when pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+    except ImportError:
+        return pd.read_csv(path, encoding='windows-1252', parse_dates=DATE_COLUMNS, date_format=DATE_FORMAT)
+
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(encoding='windows-1252'),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.timestamp('ns') for col in DATE_COLUMNS},
+            timestamp_parsers=[DATE_FORMAT]
+        )
+    )
+    # NumPy-backed columns keep resample/groupby on the regular DatetimeIndex paths
+    return table.to_pandas(coerce_temporal_nanoseconds=True)
+
+
+def write_csv(df, path):
+    """
+    Write a DataFrame to CSV (no index) with Arrow's C++ writer
+
+    Order/ship dates are written as plain ISO dates (no midnight time component).
+    Falls back to DataFrame.to_csv when pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+    except ImportError:
+        df.to_csv(path, index=False)
+        return
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for col in DATE_COLUMNS:
+        if col in table.column_names:
+            idx = table.column_names.index(col)
+            table = table.set_column(idx, col, table[col].cast(pa.date32()))
+    pacsv.write_csv(table, path)
+
+
+def to_categories(df):
+    """Cast the low-cardinality text columns to pandas category dtype"""
+    cols = [col for col in CATEGORY_COLUMNS if col in df.columns]
+    return df.astype({col: 'category' for col in cols})
+
+
+@lru_cache(maxsize=1)
+def _read_superstore():
+    # Columnar fast path: no text tokenization or type inference
+    if os.path.exists(PARQUET_PATH):
+        return pd.read_parquet(PARQUET_PATH, engine='pyarrow')
+
+    df = to_categories(read_csv(fetch_superstore()))
+    try:
+        df.to_parquet(PARQUET_PATH, engine='pyarrow', compression='zstd', index=False)
+    except ImportError:
+        pass  # pyarrow not installed; keep serving from the CSV cache
+    return df
+
+
+def load_superstore():
+    """
+    Load the raw Superstore dataset (original column names)
+
+    The parsed DataFrame is memoized per process, so every analysis step in a
+    pipeline run shares a single parse. A copy is returned so callers may
+    modify it freely.
+    """
+    return _read_superstore().copy()
+
+
+@lru_cache(maxsize=1)
+def _monthly_sales():
+    # Group on month-truncated datetime64 values (a plain int64 cast) instead of
+    # running the resample machinery; asfreq restores empty months as zero sales
+    df = _read_superstore()
+    months = df['Order Date'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+    monthly = df['Sales'].groupby(months).sum().rename_axis('Order Date')
+    return monthly.asfreq('MS', fill_value=0.0)
+
+
+def load_monthly_sales():
+    """
+    Monthly (month-start) total sales from the raw dataset
+
+    Computed once per process and shared by every analysis that needs the
+    monthly series; a copy is returned so callers may modify it freely.
+    """
+    return _monthly_sales().copy()
+
+
+def read_sql(query, db_path=DB_PATH):
+    """
+    Run a read query against the SQLite data layer
+
+    Uses connectorx when installed, which materializes the result as Arrow
+    columns instead of boxing every cell through the sqlite3 cursor; falls
+    back to sqlite3 + pandas otherwise.
+
+    Returns:
+        DataFrame with NumPy-backed columns
+    """
+    try:
+        import connectorx as cx
+    except ImportError:
+        conn = sqlite3.connect(db_path)
+        try:
+            return pd.read_sql(query, conn)
+        finally:
+            conn.close()
+
+    table = cx.read_sql(f"sqlite://{os.path.abspath(db_path)}", query, return_type="arrow")
+    return table.to_pandas()
+
+
+def load_orders(columns="*", db_path=DB_PATH):
+    """
+    Load order lines from the SQLite data layer, ready for analysis
+
+    Order_Date is parsed to datetime and Customer_ID is stored as category
+    (integer codes for the customer group-bys).
+
+    Args:
+        columns: Comma-separated column list for the SELECT (default: all)
+    """
+    df = read_sql(f"SELECT {columns} FROM orders", db_path)
+    if 'Order_Date' in df.columns:
+        df['Order_Date'] = pd.to_datetime(df['Order_Date'])
+    if 'Customer_ID' in df.columns:
+        df['Customer_ID'] = df['Customer_ID'].astype('category')
+    return df
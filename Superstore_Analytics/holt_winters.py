@@ -0,0 +1,145 @@
+"""
+Additive Holt-Winters Exponential Smoothing
+Uses statsmodels' ExponentialSmoothing(trend='add', seasonal='add') when installed,
+with a lightweight compiled fallback otherwise
+"""
+
+import itertools
+
+import numpy as np
+from scipy.optimize import minimize
+
+try:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+except ImportError:  # statsmodels is optional; fit_forecast falls back to fit_holt_winters
+    ExponentialSmoothing = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the recursion runs as plain Python instead
+    njit = None
+
+
+def _holt_winters_filter(y, alpha, beta, gamma, level, trend, initial_season):
+    # One pass of the additive level/trend/season recurrences from the given initial states
+    n = y.size
+    m = initial_season.size
+    fitted = np.empty(n)
+    season = np.empty(n + m)
+    for i in range(m):
+        season[i] = initial_season[i]
+    for t in range(n):
+        fitted[t] = level + trend + season[t]
+        prev_level = level
+        level = alpha * (y[t] - season[t]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        season[t + m] = gamma * (y[t] - level) + (1 - gamma) * season[t]
+    return fitted, level, trend, season[n:]
+
+
+if njit is not None:
+    _holt_winters_filter = njit(cache=True)(_holt_winters_filter)
+
+
+def _smoothing_weights(params):
+    # statsmodels' parameter space: 0 <= beta <= alpha and 0 <= gamma <= 1 - alpha
+    alpha = params[0]
+    return alpha, alpha * params[1], (1 - alpha) * params[2]
+
+
+def _initial_states(y, alpha, beta, gamma, m):
+    """
+    Least-squares initial level, trend and season for fixed smoothing weights
+
+    The fitted values are linear in the initial states, so they are solved exactly
+    instead of being searched for by the optimizer.
+
+    Returns:
+        (states, sse) with states = [level, trend, season_1 .. season_m]
+    """
+    zeros = np.zeros_like(y)
+    # Response of the filter to each unit initial state, and to the data alone
+    design = np.column_stack([
+        _holt_winters_filter(zeros, alpha, beta, gamma, unit[0], unit[1], unit[2:])[0]
+        for unit in np.eye(m + 2)
+    ])
+    base = _holt_winters_filter(y, alpha, beta, gamma, 0.0, 0.0, np.zeros(m))[0]
+    states = np.linalg.lstsq(design, y - base, rcond=None)[0]
+    residuals = y - base - design @ states
+    return states, residuals @ residuals
+
+
+def fit_holt_winters(y, seasonal_periods=12):
+    """
+    Fit additive trend + additive seasonality by minimizing in-sample SSE
+
+    Smoothing weights are searched on a coarse grid and refined with L-BFGS-B;
+    for each candidate the initial states are solved by least squares.
+
+    Args:
+        y: 1-D array-like of observations (needs at least two full seasons)
+        seasonal_periods: Season length (default: 12 for monthly data)
+
+    Returns:
+        dict with alpha, beta, gamma, fitted (array), level, trend, season (last cycle)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    m = seasonal_periods
+    if y.size < 2 * m:
+        raise ValueError(f"Need at least {2 * m} observations, got {y.size}")
+
+    # Fit on a unit-scale copy so the SSE surface is well conditioned
+    scale = np.abs(y).mean() or 1.0
+    z = y / scale
+
+    def sse(params):
+        return _initial_states(z, *_smoothing_weights(params), m)[1]
+
+    grid = np.linspace(0.05, 0.95, 7)
+    start = min(itertools.product(grid, grid, grid), key=sse)
+    result = minimize(sse, x0=start, method='L-BFGS-B', bounds=[(0.0, 1.0)] * 3)
+    alpha, beta, gamma = _smoothing_weights(result.x)
+    states = _initial_states(z, alpha, beta, gamma, m)[0]
+    fitted, level, trend, season = _holt_winters_filter(z, alpha, beta, gamma, states[0], states[1], states[2:])
+
+    return {
+        'alpha': alpha,
+        'beta': beta,
+        'gamma': gamma,
+        'fitted': fitted * scale,
+        'level': level * scale,
+        'trend': trend * scale,
+        'season': season * scale
+    }
+
+
+def forecast_holt_winters(model, steps):
+    """
+    Forecast future values from a fitted model
+
+    Returns:
+        Array of length `steps`
+    """
+    h = np.arange(1, steps + 1)
+    season = model['season']
+    return model['level'] + h * model['trend'] + season[(h - 1) % season.size]
+
+
+def fit_forecast(y, steps, seasonal_periods=12):
+    """
+    In-sample fitted values and a `steps`-ahead forecast
+
+    statsmodels is the reference estimator and is used whenever it is installed.
+    The fallback (fit_holt_winters) solves the initial states by least squares, so
+    its smoothing weights and forecast can differ from statsmodels on the same series.
+
+    Returns:
+        (fitted, forecast) as NumPy arrays
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if ExponentialSmoothing is not None:
+        model = ExponentialSmoothing(y, trend='add', seasonal='add', seasonal_periods=seasonal_periods).fit()
+        return np.asarray(model.fittedvalues), np.asarray(model.forecast(steps))
+
+    model = fit_holt_winters(y, seasonal_periods)
+    return model['fitted'], forecast_holt_winters(model, steps)
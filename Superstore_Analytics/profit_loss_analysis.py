@@ -1,49 +1,53 @@
 import pandas as pd
 import numpy as np
-import sqlite3
+from data_loader import read_sql
+
+# Every order column is kept in the deep-dive report, whichever entry point wrote it
+REPORT_QUERY = "SELECT * FROM orders WHERE Profit < 0"
 
 # 1. Data Retrieval
 def get_analytical_data():
-    conn = sqlite3.connect("superstore.db")
-    df = pd.read_sql("SELECT * FROM orders", conn)
-    conn.close()
-    return df
+    # Only the columns the leakage metrics use; the report reads its own rows
+    return read_sql("SELECT Sales, Discount, Profit FROM orders")
 
 # 2. Profit Leakage Analysis
 def analyze_leakage(df):
     print("💰 Analyzing Profit Leakage & Discount Sensitivity...")
     
+    # Column arrays are extracted once and shared by every metric below
+    sales = df['Sales'].to_numpy(dtype=np.float64)
+    profit = df['Profit'].to_numpy(dtype=np.float64)
+    disc = df['Discount'].to_numpy(dtype=np.float64)
+    
     # Identify Loss Makers
-    loss_df = df[df['Profit'] < 0].copy()
-    total_leaked = abs(loss_df['Profit'].sum())
+    loss_mask = profit < 0
+    total_leaked = abs(profit[loss_mask].sum())
     
     print(f"- Total Revenue Leakage Identified: ${total_leaked:,.2f}")
     
     # Prescriptive Simulation: ROI of Discount Caps
+    # Each simulation is a pure ufunc chain (no frame copies)
+    unit_cost = sales - profit
+
     def simulate_cap(cap_pct):
-        temp = df.copy()
-        temp['Unit_Cost'] = temp['Sales'] - temp['Profit']
-        
-        # Apply Cap
-        mask = temp['Discount'] > cap_pct
-        temp.loc[mask, 'New_Discount'] = cap_pct
         # Simplified assumption: Price goes up, Sales volume drops (Elasticity 0.5)
-        reduction = temp.loc[mask, 'Discount'] - cap_pct
-        temp['New_Sales'] = temp['Sales']
-        temp.loc[mask, 'New_Sales'] = temp['Sales'] * (1 - (reduction * 0.5))
-        
-        temp['New_Profit'] = temp['New_Sales'] - temp['Unit_Cost']
-        return temp['New_Profit'].sum()
+        reduction = np.maximum(disc - cap_pct, 0.0)
+        new_sales = sales * (1 - (reduction * 0.5))
+        return float((new_sales - unit_cost).sum())
 
-    base_profit = df['Profit'].sum()
+    base_profit = profit.sum()
     cap_20 = simulate_cap(0.20)
     
     print(f"- Baseline Annual Profit: ${base_profit:,.2f}")
     print(f"- Simulated Profit with 20% Discount Cap: ${cap_20:,.2f}")
     print(f"- **Strategic Opportunity**: +${(cap_20 - base_profit):,.2f} incremental gain.")
 
-    # Save to CSV
-    loss_df.to_csv('Profit_Leakage_Deep_Dive.csv', index=False)
+    # Save to CSV: the full order lines of the loss makers, fetched by the same predicate
+    report = read_sql(REPORT_QUERY)
+    # Parse dates whichever driver read them, so they are always written as plain ISO dates
+    for col in ['Order_Date', 'Ship_Date']:
+        report[col] = pd.to_datetime(report[col])
+    report.to_csv('Profit_Leakage_Deep_Dive.csv', index=False)
     print("✅ Detailed report saved: Profit_Leakage_Deep_Dive.csv")
 
 if __name__ == "__main__":
@@ -1,44 +1,112 @@
 import pandas as pd
 import numpy as np
-import sqlite3
 import plotly.express as px
 import plotly.io as pio
+from data_loader import load_orders
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; segmentation falls back to NumPy masks
+    njit = None
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; aggregation falls back to pandas groupby
+    pl = None
+
+SEGMENT_LABELS = np.array(['Champions', 'Loyalists', 'At Risk', 'Hibernating', 'Regular'])
+
+
+def _segment_codes_numpy(r, f):
+    conditions = [
+        (r >= 4) & (f >= 4),
+        (r >= 3) & (f >= 3),
+        (r <= 2) & (f >= 4),
+        r <= 1
+    ]
+    return np.select(conditions, [0, 1, 2, 3], default=4).astype(np.int8)
+
+
+def _segment_codes_loop(r, f):
+    # Single pass over the score arrays, no boolean temporaries (compiled by numba)
+    out = np.empty(r.size, dtype=np.int8)
+    for i in range(r.size):
+        ri, fi = r[i], f[i]
+        if ri >= 4 and fi >= 4:
+            out[i] = 0
+        elif ri >= 3 and fi >= 3:
+            out[i] = 1
+        elif ri <= 2 and fi >= 4:
+            out[i] = 2
+        elif ri <= 1:
+            out[i] = 3
+        else:
+            out[i] = 4
+    return out
+
+
+# Segment classifier: index into SEGMENT_LABELS, first matching rule wins
+segment_codes = njit(cache=True)(_segment_codes_loop) if njit is not None else _segment_codes_numpy
+
+
+def quintile_scores(values):
+    """Quintile bucket (1-5) per value, using the same edges as pd.qcut(values, 5)"""
+    edges = np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+    # Values equal to an edge fall in the lower bucket (right-closed intervals)
+    return (np.searchsorted(edges, values, side='left') + 1).astype(np.int8)
 
 # 1. Connect to SQL Data Layer
 def load_data():
-    conn = sqlite3.connect("superstore.db")
-    df = pd.read_sql("SELECT * FROM orders", conn)
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'])
-    conn.close()
-    return df
+    # Customer_ID arrives as category: the customer groupby hashes ints, not strings
+    return load_orders("Customer_ID, Order_ID, Order_Date, Sales")
 
 # 2. RFM Calculation Logic
+def aggregate_rfm(df, snapshot_date):
+    """Per-customer Recency (days), Frequency (order lines) and Monetary (sales)"""
+    if pl is not None:
+        # One lazy plan: group-by, recency and both reductions run in a single parallel pass
+        rfm = (
+            pl.from_pandas(df[['Customer_ID', 'Order_Date', 'Order_ID', 'Sales']])
+            .lazy()
+            .group_by('Customer_ID')
+            .agg(
+                (pl.lit(snapshot_date) - pl.col('Order_Date').max()).dt.total_days().cast(pl.Int32).alias('Recency'),
+                pl.col('Order_ID').count().cast(pl.Int64).alias('Frequency'),
+                pl.col('Sales').sum().alias('Monetary')
+            )
+            .sort('Customer_ID')
+            .collect()
+        )
+        return rfm.to_pandas().set_index('Customer_ID')
+
+    rfm = df.groupby('Customer_ID', observed=True).agg(
+        Last_Order=('Order_Date', 'max'),                      # Recency (via last order)
+        Frequency=('Order_ID', 'count'),                       # Frequency
+        Monetary=('Sales', 'sum')                              # Monetary
+    )
+    
+    # Single vectorized timedelta subtraction instead of a lambda per customer
+    rfm.insert(0, 'Recency', (snapshot_date - rfm.pop('Last_Order')).dt.days.astype('int32'))
+    return rfm
+
+
 def calculate_rfm(df):
     print("🚀 Running SQL-backed RFM Analysis...")
     snapshot_date = df['Order_Date'].max() + pd.Timedelta(days=1)
     
-    rfm = df.groupby('Customer_ID').agg({
-        'Order_Date': lambda x: (snapshot_date - x.max()).days, # Recency
-        'Order_ID': 'count',                                   # Frequency
-        'Sales': 'sum'                                         # Monetary
-    })
-    
-    rfm.columns = ['Recency', 'Frequency', 'Monetary']
+    rfm = aggregate_rfm(df, snapshot_date)
     
-    # Scoring (1-5)
-    rfm['R'] = pd.qcut(rfm['Recency'], 5, labels=[5, 4, 3, 2, 1])
-    rfm['F'] = pd.qcut(rfm['Frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5])
-    rfm['M'] = pd.qcut(rfm['Monetary'], 5, labels=[1, 2, 3, 4, 5])
+    # Scoring (1-5) as int8: quantile edges + binary search, no Categorical
+    frequency = rfm['Frequency'].to_numpy()
+    # Equivalent of rank(method='first'): ties broken by order of appearance
+    frequency_rank = np.argsort(np.argsort(frequency, kind='stable'), kind='stable') + 1
+    rfm['R'] = 6 - quintile_scores(rfm['Recency'].to_numpy())
+    rfm['F'] = quintile_scores(frequency_rank)
+    rfm['M'] = quintile_scores(rfm['Monetary'].to_numpy())
     
-    def segment_map(x):
-        r, f = int(x['R']), int(x['F'])
-        if r >= 4 and f >= 4: return 'Champions'
-        if r >= 3 and f >= 3: return 'Loyalists'
-        if r <= 2 and f >= 4: return 'At Risk'
-        if r <= 1: return 'Hibernating'
-        return 'Regular'
-        
-    rfm['Segment'] = rfm.apply(segment_map, axis=1)
+    # Segmentation: compiled classifier codes, mapped to labels once
+    codes = segment_codes(rfm['R'].to_numpy(), rfm['F'].to_numpy())
+    rfm['Segment'] = SEGMENT_LABELS[codes]
     return rfm
 
 # 3. Visualization & Reporting
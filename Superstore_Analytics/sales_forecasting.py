@@ -1,39 +1,27 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-import matplotlib.pyplot as plt
-import seaborn as sns
+from data_loader import load_monthly_sales
+from holt_winters import fit_forecast
 
-# Set style
-sns.set_theme(style="whitegrid")
-
-# 1. Load the data
-url = "https://raw.githubusercontent.com/sumit0072/Superstore-Data-Analysis/main/Sample%20-%20Superstore.csv"
+# 1 + 2. Load the data, already resampled to Monthly Sales (shared, computed once)
 try:
-    df = pd.read_csv(url, encoding='windows-1252')
+    monthly_sales = load_monthly_sales().to_frame()
 except Exception as e:
     print(f"Error loading data: {e}")
     exit()
 
-# 2. Data Preparation for Time Series
-df['Order Date'] = pd.to_datetime(df['Order Date'])
-# Resample to Monthly Sales
-monthly_sales = df.set_index('Order Date')['Sales'].resample('MS').sum().to_frame()
 monthly_sales.columns = ['Actual_Sales']
 
 # 3. Model Implementation: Holt-Winters Exponential Smoothing
 # This model handles both trend and seasonality, making it much more professional than a simple MA.
-model = ExponentialSmoothing(
-    monthly_sales['Actual_Sales'], 
-    trend='add', 
-    seasonal='add', 
-    seasonal_periods=12
-).fit()
+# Additive trend + additive seasonality: statsmodels when installed, else the compiled fallback (see holt_winters.py)
+forecast_steps = 6
+fitted_values, forecast_values = fit_forecast(monthly_sales['Actual_Sales'].to_numpy(), forecast_steps, seasonal_periods=12)
 
 # 4. In-Sample Predictions & Error Metrics
-monthly_sales['Fitted_Values'] = model.fittedvalues
+monthly_sales['Fitted_Values'] = fitted_values
 mae = mean_absolute_error(monthly_sales['Actual_Sales'], monthly_sales['Fitted_Values'])
 rmse = np.sqrt(mean_squared_error(monthly_sales['Actual_Sales'], monthly_sales['Fitted_Values']))
 
@@ -42,12 +30,18 @@ print(f"- Mean Absolute Error (MAE): ${mae:,.2f}")
 print(f"- Root Mean Squared Error (RMSE): ${rmse:,.2f}")
 
 # 5. Forecasting the Next 6 Months
-forecast_steps = 6
-forecast_values = model.forecast(forecast_steps)
 forecast_dates = pd.date_range(start=monthly_sales.index[-1] + pd.DateOffset(months=1), periods=forecast_steps, freq='MS')
 forecast_df = pd.DataFrame({'Predicted_Sales': forecast_values}, index=forecast_dates)
 
 # 6. Visualization
+# Plotting stack is imported only once the model has been fitted; the
+# non-interactive Agg backend skips GUI toolkit discovery (figure is only saved)
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+sns.set_theme(style="whitegrid")
 plt.figure(figsize=(12, 6))
 plt.plot(monthly_sales.index, monthly_sales['Actual_Sales'], label='Historical Sales', marker='o', color='#1e3a8a')
 plt.plot(monthly_sales.index, monthly_sales['Fitted_Values'], label='Fitted Model', linestyle='--', color='#10b981')
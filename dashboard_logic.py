@@ -6,6 +6,60 @@ Contains all core calculation functions without test dependencies
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the ROI kernel runs as NumPy ufuncs instead
+    njit = None
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; RFM aggregates fall back to pandas groupby
+    pl = None
+
+
+def _quintile_bins(values):
+    """
+    Quintile bin (0-4) per value, matching pd.qcut(values.rank(method='first'), 5)
+    Ties are broken by position, so every bin is populated even with repeated values
+    """
+    n = values.size
+    ranks = np.empty(n, dtype=np.float64)
+    ranks[np.argsort(values, kind='stable')] = np.arange(1, n + 1)
+    edges = np.quantile(ranks, [0.2, 0.4, 0.6, 0.8])
+    # Right-closed intervals: a rank equal to an edge falls in the lower bin
+    return np.searchsorted(edges, ranks, side='left')
+
+
+def _rfm_aggregates_polars(df):
+    """
+    Last order date, order count and sales total per customer via polars' group-by
+    Groups on factorized integer codes so the result keeps pandas' sorted customer order
+    """
+    codes, customers = pd.factorize(df['Customer_ID'], sort=True)
+    agg = (
+        pl.DataFrame({
+            'code': codes,
+            'Last_Order': df['Order_Date'].to_numpy(),
+            'Frequency': df['Order_ID'].notna().to_numpy(),
+            'Monetary': df['Sales'].to_numpy()
+        })
+        .filter(pl.col('code') >= 0)  # Missing customer IDs are dropped, as in groupby
+        .group_by('code')
+        .agg(pl.col('Last_Order').max(), pl.col('Frequency').sum().cast(pl.Int64), pl.col('Monetary').sum())
+        .sort('code')
+    )
+    rfm = agg.drop('code').to_pandas()
+    rfm.index = pd.Index(customers.take(agg['code'].to_numpy()), name='Customer_ID')
+    return rfm
+
+
+def _rfm_aggregates_pandas(df):
+    return df.groupby('Customer_ID', observed=True).agg(
+        Last_Order=('Order_Date', 'max'),
+        Frequency=('Order_ID', 'count'),
+        Monetary=('Sales', 'sum')
+    )
+
 
 def calculate_rfm(df, snapshot_date=None):
     """
@@ -24,38 +78,150 @@ def calculate_rfm(df, snapshot_date=None):
     if snapshot_date is None:
         snapshot_date = df['Order_Date'].max() + pd.Timedelta(days=1)
     
-    rfm = df.groupby('Customer_ID').agg({
-        'Order_Date': lambda x: (snapshot_date - x.max()).days,
-        'Order_ID': 'count',
-        'Sales': 'sum'
-    })
-    rfm.columns = ['Recency', 'Frequency', 'Monetary']
+    # Max/count/sum per customer in one group-by; Recency is then one vectorized subtraction
+    rfm = _rfm_aggregates_polars(df) if pl is not None else _rfm_aggregates_pandas(df)
+    rfm.insert(0, 'Recency', (snapshot_date - rfm.pop('Last_Order')).dt.days)
     
     # Assign quintile scores
     for col, labels in zip(['Recency', 'Frequency', 'Monetary'], [[5,4,3,2,1], [1,2,3,4,5], [1,2,3,4,5]]):
-        try:
-            rfm[col[0]] = pd.qcut(rfm[col].rank(method='first'), 5, labels=labels, duplicates='drop')
-        except ValueError:
+        if len(rfm) < 2:
             # Handle case where we can't create 5 bins
-            rfm[col[0]] = 3  # Default to middle score
-    
-    # Segment customers
-    def segment(row):
-        try:
-            r, f = int(row['R']), int(row['F'])
-            if r >= 4 and f >= 4:
-                return 'Champions'
-            elif r <= 2 and f >= 4:
-                return 'At Risk'
-            else:
-                return 'Regular'
-        except:
-            return 'Regular'
-    
-    rfm['Segment'] = rfm.apply(segment, axis=1)
+            rfm[col[0]] = np.int8(3)  # Default to middle score
+        else:
+            rfm[col[0]] = np.array(labels, dtype=np.int8)[_quintile_bins(rfm[col].to_numpy())]
+    
+    # Segment customers (first matching rule wins)
+    r, f = rfm['R'].to_numpy(), rfm['F'].to_numpy()
+    rfm['Segment'] = np.select(
+        [(r >= 4) & (f >= 4), (r <= 2) & (f >= 4)],
+        ['Champions', 'At Risk'],
+        default='Regular'
+    ).astype(object)
     return rfm.reset_index()
 
 
+def filter_clause(date_from, date_to, regions, categories):
+    """
+    WHERE clause + parameters for one filter state (indexed on Order_Date, Region, Category)
+    Dates form a half-open range on the ISO strings, so every order placed on date_to is included
+    """
+    clause = f"""
+        WHERE Order_Date >= ? AND Order_Date < ?
+          AND Region IN ({', '.join('?' * len(regions))})
+          AND Category IN ({', '.join('?' * len(categories))})
+    """
+    params = [
+        pd.Timestamp(date_from).strftime('%Y-%m-%d'),
+        (pd.Timestamp(date_to) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'),
+        *regions,
+        *categories
+    ]
+    return clause, params
+
+
+def dashboard_aggregates(conn, date_from, date_to, regions, categories):
+    """
+    KPIs and chart aggregates for one filter state, computed by SQLite on conn
+    Returns: {'kpis': {'records': 0}} for an empty slice, otherwise KPIs plus
+    segment_sales, prof_by_cat and monthly (month-start, gaps filled with zero)
+    """
+    where, params = filter_clause(date_from, date_to, regions, categories)
+    
+    records, revenue, profit, customers, avg_discount, high_discount = conn.execute(f"""
+        SELECT COUNT(*), SUM(Sales), SUM(Profit), COUNT(DISTINCT Customer_ID),
+               AVG(Discount), SUM(Discount > 0.2)
+        FROM orders {where}
+    """, params).fetchone()
+    
+    if records == 0:
+        return {'kpis': {'records': 0}}
+    
+    kpis = {
+        'records': records,
+        'revenue': revenue,
+        'profit': profit,
+        'margin': (profit / revenue * 100) if revenue > 0 else 0,
+        'customers': customers,
+        'avg_discount': avg_discount * 100,
+        'high_discount_orders': high_discount
+    }
+    
+    segment_sales = pd.read_sql(
+        f"SELECT Segment, SUM(Sales) AS Sales FROM orders {where} GROUP BY Segment ORDER BY Segment",
+        conn, params=params
+    )
+    prof_by_cat = pd.read_sql(
+        f"SELECT Sub_Category, SUM(Profit) AS Profit FROM orders {where} GROUP BY Sub_Category",
+        conn, params=params, index_col='Sub_Category'
+    )['Profit'].sort_values()
+    
+    # Month-start totals; months without orders are filled with zero (same as resample('MS'))
+    monthly = pd.read_sql(
+        f"""SELECT strftime('%Y-%m-01', Order_Date) AS Order_Date, SUM(Sales) AS Sales
+            FROM orders {where} GROUP BY 1 ORDER BY 1""",
+        conn, params=params, parse_dates=['Order_Date'], index_col='Order_Date'
+    )['Sales']
+    months = pd.date_range(monthly.index[0], monthly.index[-1], freq='MS', name='Order_Date')
+    monthly = monthly.reindex(months, fill_value=0.0).reset_index()
+    
+    return {
+        'kpis': kpis,
+        'segment_sales': segment_sales,
+        'prof_by_cat': prof_by_cat,
+        'monthly': monthly
+    }
+
+
+def _roi_totals_numpy(sales, profit, discount, discount_cap, elasticity):
+    capped = discount > discount_cap
+    new_sales = np.where(capped, sales * (1 - (discount - discount_cap) * elasticity), sales)
+    return profit.sum(), sales.sum(), new_sales.sum(), (new_sales - (sales - profit)).sum()
+
+
+def _roi_totals_loop(sales, profit, discount, discount_cap, elasticity):
+    # Single fused pass producing all four totals (compiled by numba)
+    profit_total = 0.0
+    sales_total = 0.0
+    new_sales_total = 0.0
+    new_profit_total = 0.0
+    for i in range(sales.size):
+        new_sales = sales[i]
+        if discount[i] > discount_cap:
+            new_sales = sales[i] * (1 - (discount[i] - discount_cap) * elasticity)
+        profit_total += profit[i]
+        sales_total += sales[i]
+        new_sales_total += new_sales
+        new_profit_total += new_sales - (sales[i] - profit[i])
+    return profit_total, sales_total, new_sales_total, new_profit_total
+
+
+# Returns (profit, sales, new_sales, new_profit) totals for a discount cap
+_roi_totals = njit(cache=True, fastmath=True)(_roi_totals_loop) if njit is not None else _roi_totals_numpy
+
+
+def calculate_roi_impact_arrays(sales, profit, discount, discount_cap, elasticity=0.5):
+    """
+    Array form of calculate_roi_impact for callers that already hold the columns
+    
+    Args:
+        sales, profit, discount: 1-D float64 arrays of equal length
+        discount_cap: Maximum allowed discount (0-1)
+        elasticity: Price elasticity coefficient (default: 0.5)
+    
+    Returns:
+        dict with original_profit, new_profit, profit_gain, revenue_risk
+    """
+    profit_total, sales_total, new_sales_total, new_profit_total = _roi_totals(
+        sales, profit, discount, float(discount_cap), float(elasticity)
+    )
+    return {
+        'original_profit': profit_total,
+        'new_profit': new_profit_total,
+        'profit_gain': new_profit_total - profit_total,
+        'revenue_risk': sales_total - new_sales_total
+    }
+
+
 def calculate_roi_impact(df, discount_cap, elasticity=0.5):
     """
     Calculate ROI impact of implementing a discount cap
@@ -76,27 +242,13 @@ def calculate_roi_impact(df, discount_cap, elasticity=0.5):
             'revenue_risk': 0
         }
     
-    sim_df = df.copy()
-    mask_cap = sim_df['Discount'] > discount_cap
-    
-    # Calculate volume loss from elasticity
-    discount_reduction = sim_df.loc[mask_cap, 'Discount'] - discount_cap
-    vol_loss = discount_reduction * elasticity
-    
-    # Calculate new sales
-    sim_df.loc[mask_cap, 'New_Sales'] = sim_df.loc[mask_cap, 'Sales'] * (1 - vol_loss)
-    sim_df['New_Sales'].fillna(sim_df['Sales'], inplace=True)
-    
-    # Calculate new profit
-    cost = sim_df['Sales'] - sim_df['Profit']
-    sim_df['New_Profit'] = sim_df['New_Sales'] - cost
-    
-    return {
-        'original_profit': sim_df['Profit'].sum(),
-        'new_profit': sim_df['New_Profit'].sum(),
-        'profit_gain': sim_df['New_Profit'].sum() - sim_df['Profit'].sum(),
-        'revenue_risk': sim_df['Sales'].sum() - sim_df['New_Sales'].sum()
-    }
+    return calculate_roi_impact_arrays(
+        df['Sales'].to_numpy(dtype=np.float64),
+        df['Profit'].to_numpy(dtype=np.float64),
+        df['Discount'].to_numpy(dtype=np.float64),
+        discount_cap,
+        elasticity
+    )
 
 
 def validate_data(df):
@@ -1,17 +1,24 @@
-import pandas as pd
 import sqlite3
 import os
+import hashlib
+
+from Superstore_Analytics.data_loader import load_superstore
 
 # Database Path
 DB_PATH = "superstore.db"
-URL = "https://raw.githubusercontent.com/sumit0072/Superstore-Data-Analysis/main/Sample%20-%20Superstore.csv"
+
+# Columnar copy of the orders table, read by the dashboard when pyarrow is installed
+PARQUET_PATH = "superstore.parquet"
+
+# Parquet metadata key holding the SHA-256 of the database the copy was exported from
+PARQUET_DB_DIGEST_KEY = b"superstore_db_sha256"
 
 def setup_db():
     print("🚀 Initializing SQL Data Layer...")
     
     # 1. Load Data
     try:
-        df = pd.read_csv(URL, encoding='windows-1252')
+        df = load_superstore()
         # Clean column names for SQL (replace spaces with underscores)
         df.columns = [c.replace(' ', '_').replace('-', '_') for c in df.columns]
         
@@ -22,10 +29,41 @@ def setup_db():
         df.to_sql('orders', conn, if_exists='replace', index=False)
         
         # 4. Create an optimized index for performance
-        conn.execute("CREATE INDEX idx_order_date ON orders(Order_Date)")
+        # (to_sql's replace dropped the table together with its indexes)
+        # Composite index matches the dashboard filter (date range + Region/Category IN lists)
+        conn.execute("CREATE INDEX idx_date_region_cat ON orders(Order_Date, Region, Category)")
+        # Covering indexes for the sidebar's SELECT DISTINCT Region / Category queries
         conn.execute("CREATE INDEX idx_region ON orders(Region)")
+        conn.execute("CREATE INDEX idx_category ON orders(Category)")
+        
+        # Planner statistics, so the date-range seek is chosen over a full scan
+        conn.execute("ANALYZE")
+        conn.commit()
         
         conn.close()
+        
+        # 5. Columnar export, sorted by (Order_Date, Row_ID) like the SQL path so
+        #    row-group statistics prune date filters and ties keep a stable order
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            with open(DB_PATH, 'rb') as f:
+                db_digest = hashlib.file_digest(f, 'sha256').hexdigest()
+            table = pa.Table.from_pandas(
+                df.sort_values(['Order_Date', 'Row_ID'], kind='stable'), preserve_index=False
+            )
+            # Stamp the copy with the database it came from; the dashboard compares digests
+            table = table.replace_schema_metadata(
+                {**table.schema.metadata, PARQUET_DB_DIGEST_KEY: db_digest.encode()}
+            )
+            pq.write_table(table, PARQUET_PATH, compression='zstd')
+            print(f"✅ Columnar copy written to {PARQUET_PATH}")
+        except ImportError:
+            # pyarrow not installed; drop any older copy so the dashboard reads SQLite only
+            if os.path.exists(PARQUET_PATH):
+                os.remove(PARQUET_PATH)
+        
         print(f"✅ Success! Data migrated to {DB_PATH}")
         print("💡 Recruiters will now see that you use SQL instead of just CSVs.")
         
@@ -1,7 +1,13 @@
+import os
+import sys
+
 import pytest
 import pandas as pd
 import numpy as np
 
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'Superstore_Analytics'))
+
 # Mock data for testing
 @pytest.fixture
 def sample_data():
@@ -37,3 +43,196 @@ def test_profitability_logic(sample_data):
 def test_data_integrity(sample_data):
     """Ensure no nulls exist after basic cleaning."""
     assert sample_data.isnull().sum().sum() == 0
+
+def test_pipeline_imports_analysis_modules_by_script_name():
+    """The pipeline must import the numba-compiled modules under the name they run under standalone."""
+    import ast
+    with open(os.path.join(ROOT_DIR, 'Superstore_Analytics', 'Final_Portfolio_Project.py')) as f:
+        tree = ast.parse(f.read())
+    imported = {alias.name for node in ast.walk(tree) if isinstance(node, ast.Import) for alias in node.names}
+    assert {'rfm_analysis', 'profit_loss_analysis', 'customer_clustering'} <= imported
+    # A package-qualified import would load a second copy with its own JIT cache index
+    assert not any(isinstance(node, ast.ImportFrom) and (node.module or '').startswith('Superstore_Analytics')
+                   for node in ast.walk(tree))
+
+def test_rfm_dispatcher_resolves_under_script_name():
+    numba = pytest.importorskip('numba')
+    import rfm_analysis
+    dispatcher = rfm_analysis.segment_codes
+    assert isinstance(dispatcher, numba.core.registry.CPUDispatcher)
+    assert dispatcher.py_func.__module__ == 'rfm_analysis'
+    assert 'Superstore_Analytics.rfm_analysis' not in sys.modules
+    r, f = np.array([5, 1, 3], dtype=np.int8), np.array([5, 1, 2], dtype=np.int8)
+    assert np.array_equal(dispatcher(r, f), rfm_analysis._segment_codes_numpy(r, f))
+    assert dispatcher.signatures
+
+def _seasonal_series(noise, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(48)
+    return 1000 + 5 * t + 100 * np.sin(2 * np.pi * t / 12) + rng.normal(0, noise, t.size)
+
+def test_holt_winters_recovers_noise_free_series():
+    """A pure trend + season series is fitted exactly and extrapolated one season ahead."""
+    from holt_winters import fit_holt_winters, forecast_holt_winters
+    y = _seasonal_series(noise=0)
+    model = fit_holt_winters(y, seasonal_periods=12)
+    np.testing.assert_allclose(model['fitted'], y, atol=1e-6)
+
+    t = np.arange(48, 60)
+    expected = 1000 + 5 * t + 100 * np.sin(2 * np.pi * t / 12)
+    np.testing.assert_allclose(forecast_holt_winters(model, 12), expected, atol=1e-6)
+
+@pytest.mark.parametrize("noise", [5, 30, 80])
+def test_fit_forecast_reproduces_statsmodels(noise):
+    """With statsmodels installed, the forecasting entry point returns its fit and forecast unchanged."""
+    holtwinters = pytest.importorskip("statsmodels.tsa.holtwinters")
+    from holt_winters import fit_forecast
+    y = _seasonal_series(noise)
+    fitted, forecast = fit_forecast(y, 6, seasonal_periods=12)
+    reference = holtwinters.ExponentialSmoothing(y, trend='add', seasonal='add', seasonal_periods=12).fit()
+    np.testing.assert_allclose(fitted, reference.fittedvalues, rtol=1e-9)
+    np.testing.assert_allclose(forecast, reference.forecast(6), rtol=1e-9)
+
+@pytest.mark.parametrize("noise", [5, 30, 80])
+def test_holt_winters_fit_matches_statsmodels(noise):
+    """In-sample SSE is no worse than statsmodels' additive Holt-Winters on the same series."""
+    holtwinters = pytest.importorskip("statsmodels.tsa.holtwinters")
+    from holt_winters import fit_holt_winters
+    y = _seasonal_series(noise)
+    model = fit_holt_winters(y, seasonal_periods=12)
+    reference = holtwinters.ExponentialSmoothing(y, trend='add', seasonal='add', seasonal_periods=12).fit()
+    sse = np.sum((y - model['fitted']) ** 2)
+    assert sse <= np.sum((y - reference.fittedvalues) ** 2) * 1.001
+
+def _reference_segment(r, f):
+    if r >= 4 and f >= 4: return 'Champions'
+    if r >= 3 and f >= 3: return 'Loyalists'
+    if r <= 2 and f >= 4: return 'At Risk'
+    if r <= 1: return 'Hibernating'
+    return 'Regular'
+
+def _reference_rfm_scores(rfm):
+    """Original pd.qcut scoring and row-wise segment rules that rfm_analysis replaced."""
+    scores = pd.DataFrame({
+        'R': pd.qcut(rfm['Recency'], 5, labels=[5, 4, 3, 2, 1]).astype(int),
+        'F': pd.qcut(rfm['Frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5]).astype(int),
+        'M': pd.qcut(rfm['Monetary'], 5, labels=[1, 2, 3, 4, 5]).astype(int)
+    })
+    scores['Segment'] = scores.apply(lambda x: _reference_segment(x['R'], x['F']), axis=1)
+    return scores
+
+@pytest.fixture
+def rfm_orders():
+    """Order lines for 200 customers with heavy ties in recency, frequency and sales."""
+    rng = np.random.default_rng(7)
+    customers = np.repeat([f'C{i:03d}' for i in range(200)], rng.integers(1, 6, 200))
+    return pd.DataFrame({
+        'Customer_ID': pd.Categorical(customers),
+        'Order_ID': [f'O{i}' for i in range(customers.size)],
+        'Order_Date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 40, customers.size), unit='D'),
+        'Sales': rng.integers(1, 30, customers.size) * 10.0
+    })
+
+@pytest.mark.parametrize("values", [
+    np.arange(21),                                             # every quintile edge equals a value
+    np.arange(1, 26),                                          # edges fall between values
+    np.random.default_rng(1).integers(0, 60, 500),             # many ties, integer edges
+    np.random.default_rng(2).normal(100, 25, 333)
+])
+def test_quintile_scores_match_qcut(values):
+    from rfm_analysis import quintile_scores
+    expected = pd.qcut(values, 5, labels=False) + 1
+    np.testing.assert_array_equal(quintile_scores(values), expected)
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_segment_codes_match_rule_chain(use_numpy):
+    import rfm_analysis
+    classify = rfm_analysis._segment_codes_numpy if use_numpy else rfm_analysis.segment_codes
+    # Every (R, F) score pair
+    r, f = (a.ravel().astype(np.int8) for a in np.meshgrid(np.arange(1, 6), np.arange(1, 6)))
+    labels = rfm_analysis.SEGMENT_LABELS[classify(r, f)]
+    assert list(labels) == [_reference_segment(ri, fi) for ri, fi in zip(r, f)]
+
+@pytest.mark.parametrize("fallbacks", [False, True])
+def test_calculate_rfm_matches_qcut_reference(rfm_orders, monkeypatch, fallbacks):
+    """Scores and segments equal the original qcut implementation, with and without numba/polars."""
+    import rfm_analysis
+    if fallbacks:
+        monkeypatch.setattr(rfm_analysis, 'pl', None)
+        monkeypatch.setattr(rfm_analysis, 'segment_codes', rfm_analysis._segment_codes_numpy)
+    rfm = rfm_analysis.calculate_rfm(rfm_orders)
+    expected = _reference_rfm_scores(rfm)
+    pd.testing.assert_frame_equal(rfm[['R', 'F', 'M', 'Segment']].astype({'R': int, 'F': int, 'M': int}), expected)
+
+def test_aggregate_rfm_pandas_path_matches_polars(rfm_orders, monkeypatch):
+    import rfm_analysis
+    pytest.importorskip("polars")
+    snapshot_date = rfm_orders['Order_Date'].max() + pd.Timedelta(days=1)
+    with_polars = rfm_analysis.aggregate_rfm(rfm_orders, snapshot_date)
+    monkeypatch.setattr(rfm_analysis, 'pl', None)
+    with_pandas = rfm_analysis.aggregate_rfm(rfm_orders, snapshot_date)
+    pd.testing.assert_frame_equal(with_pandas, with_polars)
+
+@pytest.fixture
+def clustering_orders():
+    """Order lines for 60 customers, interleaved so each customer spans several chunks."""
+    rng = np.random.default_rng(11)
+    n = 500
+    return pd.DataFrame({
+        'Customer_ID': rng.choice([f'C{i:02d}' for i in range(60)], n),
+        'Sales': rng.uniform(5, 2000, n).round(2),
+        'Profit': rng.uniform(-300, 500, n).round(2),
+        'Discount': rng.choice([0.0, 0.1, 0.2, 0.3, 0.5], n)
+    })
+
+def test_customer_features_chunked_pandas_path_matches_polars(clustering_orders, tmp_path, monkeypatch):
+    import sqlite3
+    import customer_clustering
+    pytest.importorskip("polars")
+    db_path = str(tmp_path / 'superstore.db')
+    with sqlite3.connect(db_path) as conn:
+        clustering_orders.to_sql('orders', conn, index=False)
+    conn.close()
+
+    with_polars = customer_clustering.load_customer_features(db_path)
+    in_memory_polars = customer_clustering.aggregate_customer_features(clustering_orders)
+    monkeypatch.setattr(customer_clustering, 'pl', None)
+    monkeypatch.setattr(customer_clustering, 'FEATURE_CHUNK_SIZE', 64)
+    chunked_pandas = customer_clustering.load_customer_features(db_path)
+    in_memory_pandas = customer_clustering.aggregate_customer_features(clustering_orders)
+
+    for result in (in_memory_polars, chunked_pandas, in_memory_pandas):
+        pd.testing.assert_frame_equal(result, with_polars)
+
+def test_leakage_report_schema_independent_of_entry_point(tmp_path, monkeypatch):
+    """The standalone script and the pipeline write the same deep-dive report."""
+    import sqlite3
+    import profit_loss_analysis
+    from Final_Portfolio_Project import PIPELINE_COLUMNS
+    from data_loader import load_orders
+
+    monkeypatch.chdir(tmp_path)
+    orders = pd.DataFrame({
+        'Row_ID': [1, 2, 3],
+        'Order_ID': ['O1', 'O2', 'O3'],
+        'Order_Date': ['2023-01-01 00:00:00', '2023-01-02 00:00:00', '2023-01-03 00:00:00'],
+        'Ship_Date': ['2023-01-04 00:00:00', '2023-01-05 00:00:00', '2023-01-06 00:00:00'],
+        'Customer_ID': ['C1', 'C2', 'C1'],
+        'Customer_Name': ['Ann', 'Bob', 'Ann'],
+        'Product_Name': ['Desk', 'Chair', 'Lamp'],
+        'Sales': [100.0, 50.0, 20.0],
+        'Quantity': [1, 2, 3],
+        'Discount': [0.5, 0.0, 0.3],
+        'Profit': [-30.0, 10.0, -5.0]
+    })
+    with sqlite3.connect('superstore.db') as conn:
+        orders.to_sql('orders', conn, index=False)
+
+    profit_loss_analysis.analyze_leakage(profit_loss_analysis.get_analytical_data())
+    standalone = pd.read_csv('Profit_Leakage_Deep_Dive.csv')
+    profit_loss_analysis.analyze_leakage(load_orders(PIPELINE_COLUMNS))
+    pipeline = pd.read_csv('Profit_Leakage_Deep_Dive.csv')
+
+    assert list(standalone.columns) == list(orders.columns)
+    assert standalone['Order_ID'].tolist() == ['O1', 'O3']
+    pd.testing.assert_frame_equal(standalone, pipeline)
@@ -10,144 +10,12 @@ from datetime import datetime, timedelta
 import sys
 import os
 
-# Import business logic functions to test
-from dashboard_logic import calculate_rfm, calculate_roi_impact, validate_data
-
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Business Logic Functions (will be extracted from dashboard)
-def calculate_rfm(df, snapshot_date=None):
-    """
-    Calculate RFM (Recency, Frequency, Monetary) scores for customers
-    
-    Args:
-        df: DataFrame with Order_Date, Customer_ID, Order_ID, Sales columns
-        snapshot_date: Reference date for recency calculation (default: max date + 1 day)
-    
-    Returns:
-        DataFrame with RFM scores and segments
-    """
-    if df.empty:
-        return pd.DataFrame(columns=['Customer_ID', 'Recency', 'Frequency', 'Monetary', 'Segment'])
-    
-    if snapshot_date is None:
-        snapshot_date = df['Order_Date'].max() + pd.Timedelta(days=1)
-    
-    rfm = df.groupby('Customer_ID').agg({
-        'Order_Date': lambda x: (snapshot_date - x.max()).days,
-        'Order_ID': 'count',
-        'Sales': 'sum'
-    })
-    rfm.columns = ['Recency', 'Frequency', 'Monetary']
-    
-    # Assign quintile scores
-    for col, labels in zip(['Recency', 'Frequency', 'Monetary'], [[5,4,3,2,1], [1,2,3,4,5], [1,2,3,4,5]]):
-        try:
-            rfm[col[0]] = pd.qcut(rfm[col].rank(method='first'), 5, labels=labels, duplicates='drop')
-        except ValueError:
-            # Handle case where we can't create 5 bins
-            rfm[col[0]] = 3  # Default to middle score
-    
-    # Segment customers
-    def segment(row):
-        try:
-            r, f = int(row['R']), int(row['F'])
-            if r >= 4 and f >= 4:
-                return 'Champions'
-            elif r <= 2 and f >= 4:
-                return 'At Risk'
-            else:
-                return 'Regular'
-        except:
-            return 'Regular'
-    
-    rfm['Segment'] = rfm.apply(segment, axis=1)
-    return rfm.reset_index()
-
-
-def calculate_roi_impact(df, discount_cap, elasticity=0.5):
-    """
-    Calculate ROI impact of implementing a discount cap
-    
-    Args:
-        df: DataFrame with Discount, Sales, Profit columns
-        discount_cap: Maximum allowed discount (0-1)
-        elasticity: Price elasticity coefficient (default: 0.5)
-    
-    Returns:
-        dict with original_profit, new_profit, profit_gain, revenue_risk
-    """
-    if df.empty:
-        return {
-            'original_profit': 0,
-            'new_profit': 0,
-            'profit_gain': 0,
-            'revenue_risk': 0
-        }
-    
-    sim_df = df.copy()
-    mask_cap = sim_df['Discount'] > discount_cap
-    
-    # Calculate volume loss from elasticity
-    discount_reduction = sim_df.loc[mask_cap, 'Discount'] - discount_cap
-    vol_loss = discount_reduction * elasticity
-    
-    # Calculate new sales
-    sim_df.loc[mask_cap, 'New_Sales'] = sim_df.loc[mask_cap, 'Sales'] * (1 - vol_loss)
-    sim_df['New_Sales'].fillna(sim_df['Sales'], inplace=True)
-    
-    # Calculate new profit
-    cost = sim_df['Sales'] - sim_df['Profit']
-    sim_df['New_Profit'] = sim_df['New_Sales'] - cost
-    
-    return {
-        'original_profit': sim_df['Profit'].sum(),
-        'new_profit': sim_df['New_Profit'].sum(),
-        'profit_gain': sim_df['New_Profit'].sum() - sim_df['Profit'].sum(),
-        'revenue_risk': sim_df['Sales'].sum() - sim_df['New_Sales'].sum()
-    }
-
-
-def validate_data(df):
-    """
-    Validate that DataFrame has required columns and data quality
-    
-    Returns:
-        dict with 'valid' boolean and 'errors' list
-    """
-    required_columns = ['Order_Date', 'Customer_ID', 'Order_ID', 'Sales', 'Profit', 'Discount', 'Region', 'Category', 'Segment']
-    
-    errors = []
-    
-    # Check for required columns
-    missing_cols = [col for col in required_columns if col not in df.columns]
-    if missing_cols:
-        errors.append(f"Missing required columns: {', '.join(missing_cols)}")
-    
-    if df.empty:
-        errors.append("DataFrame is empty")
-        return {'valid': False, 'errors': errors}
-    
-    # Check for null values in critical columns
-    critical_cols = ['Order_Date', 'Customer_ID', 'Sales']
-    for col in critical_cols:
-        if col in df.columns and df[col].isnull().any():
-            errors.append(f"Null values found in {col}")
-    
-    # Check data types
-    if 'Order_Date' in df.columns:
-        if not pd.api.types.is_datetime64_any_dtype(df['Order_Date']):
-            errors.append("Order_Date must be datetime type")
-    
-    # Check for negative sales/profit (warning, not error)
-    if 'Sales' in df.columns and (df['Sales'] < 0).any():
-        errors.append("Warning: Negative sales values detected")
-    
-    return {
-        'valid': len(errors) == 0,
-        'errors': errors
-    }
+# Import business logic functions to test
+from dashboard_logic import calculate_rfm, calculate_roi_impact, validate_data
+import dashboard_logic
 
 
 # ============= UNIT TESTS =============
@@ -248,6 +116,20 @@ class TestROICalculation:
         
         # All discounts exceed cap, should have significant impact
         assert result['revenue_risk'] > 0
+    
+    def test_roi_arrays_match_numpy_path(self):
+        """Test the compiled ROI kernel against the NumPy fallback"""
+        rng = np.random.default_rng(0)
+        sales = rng.uniform(10, 5000, 1000)
+        profit = rng.uniform(-500, 800, 1000)
+        discount = rng.choice([0.0, 0.1, 0.2, 0.3, 0.5, 0.8], 1000)
+        
+        result = dashboard_logic.calculate_roi_impact_arrays(sales, profit, discount, 0.2, 0.5)
+        expected = dashboard_logic._roi_totals_numpy(sales, profit, discount, 0.2, 0.5)
+        
+        assert result['original_profit'] == pytest.approx(expected[0])
+        assert result['revenue_risk'] == pytest.approx(expected[1] - expected[2])
+        assert result['new_profit'] == pytest.approx(expected[3])
 
 
 class TestDataValidation:
@@ -352,6 +234,84 @@ class TestDatabaseIntegration:
         assert len(df) > 0, "Query returned no results"
 
 
+class TestFilteredKPIs:
+    """Test the SQL KPIs against a pandas reference on an in-memory database"""
+
+    @pytest.fixture
+    def orders(self):
+        rng = np.random.default_rng(3)
+        n = 400
+        return pd.DataFrame({
+            'Order_Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 120, n), unit='D'),
+            'Customer_ID': rng.choice([f'C{i}' for i in range(40)], n),
+            'Segment': rng.choice(['Consumer', 'Corporate', 'Home Office'], n),
+            'Region': rng.choice(['East', 'West', 'South', 'Central'], n),
+            'Category': rng.choice(['Furniture', 'Technology', 'Office Supplies'], n),
+            'Sub_Category': rng.choice(['Chairs', 'Phones', 'Binders', 'Tables'], n),
+            'Sales': rng.uniform(5, 2000, n).round(2),
+            'Profit': rng.uniform(-300, 500, n).round(2),
+            'Discount': rng.choice([0.0, 0.1, 0.2, 0.3, 0.5], n)
+        })
+
+    @pytest.fixture
+    def conn(self, orders):
+        import sqlite3
+        conn = sqlite3.connect(':memory:')
+        # Same storage as setup_database.py: to_sql writes timestamps as ISO text
+        orders.to_sql('orders', conn, index=False)
+        yield conn
+        conn.close()
+
+    def test_kpis_match_pandas(self, orders, conn):
+        """Test filtered KPIs and chart aggregates, with date_to inclusive"""
+        date_from, date_to = datetime(2024, 2, 1).date(), datetime(2024, 3, 15).date()
+        regions, categories = ('East', 'West'), ('Furniture', 'Technology')
+
+        bundle = dashboard_logic.dashboard_aggregates(conn, date_from, date_to, regions, categories)
+
+        ref = orders[
+            orders['Order_Date'].between(pd.Timestamp(date_from), pd.Timestamp(date_to))
+            & orders['Region'].isin(regions) & orders['Category'].isin(categories)
+        ]
+        assert (ref['Order_Date'] == pd.Timestamp(date_to)).any()  # end date is exercised
+
+        kpis = bundle['kpis']
+        assert kpis['records'] == len(ref)
+        assert kpis['revenue'] == pytest.approx(ref['Sales'].sum())
+        assert kpis['profit'] == pytest.approx(ref['Profit'].sum())
+        assert kpis['margin'] == pytest.approx(ref['Profit'].sum() / ref['Sales'].sum() * 100)
+        assert kpis['customers'] == ref['Customer_ID'].nunique()
+        assert kpis['avg_discount'] == pytest.approx(ref['Discount'].mean() * 100)
+        assert kpis['high_discount_orders'] == (ref['Discount'] > 0.2).sum()
+
+        segment_ref = ref.groupby('Segment')['Sales'].sum()
+        assert list(bundle['segment_sales']['Segment']) == list(segment_ref.index)
+        assert np.allclose(bundle['segment_sales']['Sales'], segment_ref.values)
+        prof_ref = ref.groupby('Sub_Category')['Profit'].sum()
+        assert np.allclose(bundle['prof_by_cat'].sort_index(), prof_ref.sort_index())
+        monthly_ref = ref.set_index('Order_Date')['Sales'].resample('MS').sum()
+        assert list(bundle['monthly']['Order_Date']) == list(monthly_ref.index)
+        assert np.allclose(bundle['monthly']['Sales'], monthly_ref.values)
+
+    def test_single_day_range(self, orders, conn):
+        """Test date_from == date_to selects exactly that day's orders"""
+        day = orders['Order_Date'].iloc[0]
+        regions = tuple(orders['Region'].unique())
+        categories = tuple(orders['Category'].unique())
+
+        bundle = dashboard_logic.dashboard_aggregates(conn, day.date(), day.date(), regions, categories)
+
+        assert bundle['kpis']['records'] == (orders['Order_Date'] == day).sum()
+
+    def test_empty_slice(self, conn):
+        """Test a filter state with no matching orders"""
+        bundle = dashboard_logic.dashboard_aggregates(
+            conn, datetime(2030, 1, 1).date(), datetime(2030, 1, 31).date(), ('East',), ('Furniture',)
+        )
+
+        assert bundle == {'kpis': {'records': 0}}
+
+
 # ============= EDGE CASE TESTS =============
 
 class TestEdgeCases: